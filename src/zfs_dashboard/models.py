@@ -1,12 +1,12 @@
 from dataclasses import dataclass, field
 from typing import List, Optional
 
-@dataclass
+@dataclass(slots=True)
 class Snapshot:
     name: str
     used: str
 
-@dataclass
+@dataclass(slots=True)
 class Dataset:
     name: str
     used: str
@@ -16,8 +16,9 @@ class Dataset:
     compression: str = "off"
     children: List['Dataset'] = field(default_factory=list)
     snapshots: List[Snapshot] = field(default_factory=list)
+    label: str = "" # Tree label, formatted once by the parser
 
-@dataclass
+@dataclass(slots=True)
 class Vdev:
     name: str
     state: str
@@ -36,7 +37,7 @@ class Vdev:
     frag: str = ""
     cap: str = ""
 
-@dataclass
+@dataclass(slots=True)
 class Pool:
     name: str
     state: str
@@ -47,6 +48,10 @@ class Pool:
     cap: str
     health: str
     altroot: str = "-"
+    # Raw byte counts behind size/alloc/free (from `zpool list -p`)
+    size_bytes: int = 0
+    alloc_bytes: int = 0
+    free_bytes: int = 0
     # IO Stats
     read_ops: int = 0
     write_ops: int = 0
@@ -1,62 +1,27 @@
+import asyncio
+import logging
+import re
+import threading
+from contextlib import suppress
+from functools import partial
+from typing import Optional
+
 from textual.app import App
 from textual.binding import Binding
+from textual.worker import Worker, WorkerState
 
-from ..zfs import get_static_data, parse_iostat_line
+from ..models import Pool
+from ..zfs import COMMAND_ENV, ZPOOL, ZfsCache, parse_iostat_line
 from .screens import DashboardScreen
-import threading
-import subprocess
-import time
-
-class IostatWorker(threading.Thread):
-    def __init__(self, callback):
-        super().__init__(daemon=True)
-        self.callback = callback
-        self.running = True
-        
-    def run(self):
-        # Run zpool iostat -H -p -y 1
-        # -H: Scripted mode (no headers, tabs)
-        # -p: Parsable numbers
-        # -y: Omit first report (since boot) - available in newer ZFS
-        # If -y not supported, we just ignore the first line if it looks huge? 
-        # Actually -y is best. If not available, we might see a big spike at start.
-        # Let's assume -y is available or acceptable behavior.
-        # We need to run it continuously.
-        
-        cmd = ['zpool', 'iostat', '-v', '-H', '-p', '-y', '1']
-        
-        # Fallback if -y is not supported?
-        # Let's try running it.
-        try:
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1 # Line buffered
-            )
-            
-            while self.running and process.poll() is None:
-                line = process.stdout.readline()
-                if not line:
-                    break
-                
-                stats = parse_iostat_line(line)
-                if stats:
-                    self.callback(stats)
-                    
-        except FileNotFoundError:
-            pass # zpool not found
-        except Exception as e:
-            print(f"Iostat worker error: {e}")
-        finally:
-            if process:
-                process.terminate()
-                process.wait()
 
-    def stop(self):
-        self.running = False
+logger = logging.getLogger(__name__)
 
+# Run zpool iostat -v -H -p -y 1
+# -H: Scripted mode (no headers, tabs)
+# -p: Parsable numbers
+# -y: Omit first report (since boot) - available in newer ZFS
+IOSTAT_COMMAND = [ZPOOL, 'iostat', '-v', '-H', '-p', '-y', '1']
+IOSTAT_STOP_TIMEOUT = 1 # seconds to wait for zpool to exit before killing it
 
 class ZfsDashboardApp(App):
     CSS = """
@@ -102,79 +67,152 @@ class ZfsDashboardApp(App):
         self.interval = interval
         self.pool_filter = pool_filter
         self.dataset_filter = dataset_filter
+        # Compiled once here; the tree widgets only ever call .search on it
+        try:
+            self.dataset_filter_re = re.compile(dataset_filter) if dataset_filter else None
+        except re.error:
+            self.dataset_filter_re = None
+        self.cache = ZfsCache()
         self.pools = []
+        self._reload_lock = threading.Lock()
+        self._iostat_process = None
+        self._iostat_stopping = None
 
     def on_mount(self):
         self.action_refresh_data()
-        # Start background worker
-        self.worker = IostatWorker(self.update_iostat)
-        self.worker.start()
+        # Structure only changes when datasets/pools change, so instead of
+        # re-running zpool/zfs every interval we just check its fingerprint.
+        self.set_interval(self.interval, self.check_structure)
+        # Stream iostat on the event loop; on_unmount stops zpool on exit
+        self.run_worker(self.iostat_worker(), name="iostat", exclusive=True)
+
+    async def on_unmount(self):
+        # Textual cancels workers without waiting for them, and asyncio.run
+        # cancels them again on the way out, so the worker can't be relied
+        # on to reap zpool. The loop is still running here.
+        await self.stop_iostat()
+
+    async def iostat_worker(self):
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *IOSTAT_COMMAND,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                env=COMMAND_ENV,
+            )
+        except FileNotFoundError:
+            return # zpool not found
+        self._iostat_process = process
+
+        try:
+            async for line in process.stdout:
+                # stats is tuple: (name, read_ops, write_ops, read_bytes, write_bytes)
+                stats = parse_iostat_line(line.decode())
+                if stats:
+                    self._update_iostat_ui(stats)
+        except Exception as e:
+            logger.error("Iostat worker error: %s", e)
+        finally:
+            # Cancellation interrupts the pending read right away; make sure
+            # zpool is gone and reaped too so no stray process outlives us.
+            await self.stop_iostat()
 
-    def on_unmount(self):
-        if hasattr(self, 'worker'):
-            self.worker.stop()
+    async def stop_iostat(self):
+        """Terminates zpool iostat (killing it if it won't exit) and reaps it."""
+        if self._iostat_process is None:
+            return
+        # The worker and on_unmount both get here on exit; run the shutdown
+        # once, and shielded, so cancelling the worker can't cut it short
+        if self._iostat_stopping is None:
+            self._iostat_stopping = asyncio.create_task(self._reap_iostat(self._iostat_process))
+        await asyncio.shield(self._iostat_stopping)
 
-    def update_iostat(self, stats):
-        # stats is tuple: (name, read_ops, write_ops, read_bytes, write_bytes)
-        # We need to update the UI.
-        # Since this is called from a thread, we must use call_from_thread
-        self.call_from_thread(self._update_iostat_ui, stats)
+    async def _reap_iostat(self, process: asyncio.subprocess.Process):
+        if process.returncode is None:
+            with suppress(ProcessLookupError):
+                process.terminate()
+        # communicate() also drains stdout to EOF, which is what lets asyncio
+        # close the subprocess transport; it has to happen while the event
+        # loop is still alive, even when zpool has already exited
+        try:
+            await asyncio.wait_for(process.communicate(), IOSTAT_STOP_TIMEOUT)
+        except asyncio.TimeoutError:
+            with suppress(ProcessLookupError):
+                process.kill()
+            # Bounded too: anything that inherited the pipe keeps it open
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(process.communicate(), IOSTAT_STOP_TIMEOUT)
 
     def _update_iostat_ui(self, stats):
         if self.screen and isinstance(self.screen, DashboardScreen):
             self.screen.update_iostat_data(stats)
 
+    def check_structure(self):
+        # A slow zfs list can outlast the interval; skip ticks meanwhile
+        if not any(worker.is_running for worker in self.workers if worker.group == "structure"):
+            self.reload_structure()
+
     def action_refresh_data(self):
-        all_pools = get_static_data()
-        
+        self.reload_structure(force=True)
+
+    def reload_structure(self, force: bool = False):
+        # zpool/zfs can take seconds on big pools, keep them off the event
+        # loop so the UI and the iostat stream stay live
+        self.run_worker(partial(self._reload_structure, force), name="structure",
+                        group="structure", thread=True)
+
+    def _reload_structure(self, force: bool) -> Optional[list[Pool]]:
+        # Runs in a worker thread. Only re-runs zpool/zfs when the pools or
+        # ZED's list cache changed, and only for the pools whose datasets
+        # changed; the lock keeps a refresh (F5) and a tick from overlapping.
+        with self._reload_lock:
+            if self.cache.refresh(force=force):
+                return self.cache.pools
+        return None
+
+    def on_worker_state_changed(self, event: Worker.StateChanged):
+        # Back on the event loop with the reloaded pools
+        worker = event.worker
+        if worker.group == "structure" and event.state == WorkerState.SUCCESS and worker.result is not None:
+            self.load_pools(worker.result)
+
+    def load_pools(self, all_pools: list[Pool]):
         # Apply pool filter
         if self.pool_filter:
-            self.pools = [p for p in all_pools if p.name == self.pool_filter]
+            pools = [p for p in all_pools if p.name == self.pool_filter]
         else:
-            self.pools = all_pools
+            pools = all_pools
+
+        # Keep the live IO stats from the iostat stream, only the structure is new
+        previous = {pool.name: pool for pool in self.pools}
+        for pool in pools:
+            old = previous.get(pool.name)
+            if old and old is not pool:
+                self._carry_over_iostat(old, pool)
+        self.pools = pools
+        pool_names = [pool.name for pool in all_pools]
             
-        # Apply dataset filter (regex)
-        # We need to filter datasets within pools.
-        # Since datasets are a tree, if a child matches, we might need to keep parents.
-        # Or just filter the list?
-        # The requirement says "regex filter to dataset list".
-        # I'll pass this filter to the UI widgets or filter here.
-        # Filtering here is cleaner for the model.
-        
-        if self.dataset_filter:
-            import re
-            try:
-                pattern = re.compile(self.dataset_filter)
-                for pool in self.pools:
-                    # Filter datasets. This is tricky with tree structure.
-                    # If we filter the flat list, we might break the tree if we rebuild it.
-                    # But `pool.datasets` currently contains ROOTS of the tree.
-                    # If I filter roots, I might lose children.
-                    # Actually `pool.datasets` in `models.py` are roots?
-                    # In `zfs.py`: `pool.datasets = [ds for ds in root_datasets if ds.name == pool.name]`
-                    # Yes, usually just the root dataset.
-                    
-                    # So I need to traverse the tree and filter.
-                    # Or I can pass the filter to the widget.
-                    # Passing to widget is better because it can handle "match or has matching child" logic which I already implemented for search.
-                    pass 
-            except re.error:
-                pass
-        
         # If screen is not mounted, mount it
         if not self.screen or not isinstance(self.screen, DashboardScreen):
-            screen = DashboardScreen(self.pools)
-            if self.dataset_filter:
-                screen.dataset_filter = self.dataset_filter
+            screen = DashboardScreen(self.pools, pool_names)
+            screen.dataset_filter = self.dataset_filter_re
             self.push_screen(screen)
         else:
             # Update existing screen
             screen = self.screen
-            screen.pools = self.pools
-            if self.dataset_filter:
-                screen.dataset_filter = self.dataset_filter
-                
-            if len(self.pools) > 1:
-                screen.update_all_tab()
-            for pool in self.pools:
-                screen.update_pool_data(pool)
+            screen.set_pools(self.pools, pool_names)
+
+    def _carry_over_iostat(self, old: Pool, new: Pool):
+        new.read_ops = old.read_ops
+        new.write_ops = old.write_ops
+        new.read_bytes = old.read_bytes
+        new.write_bytes = old.write_bytes
+
+        old_vdevs = {vdev.name: vdev for vdev in old.vdevs}
+        for vdev in new.vdevs:
+            old_vdev = old_vdevs.get(vdev.name)
+            if old_vdev:
+                vdev.read_ops = old_vdev.read_ops
+                vdev.write_ops = old_vdev.write_ops
+                vdev.read_bytes = old_vdev.read_bytes
+                vdev.write_bytes = old_vdev.write_bytes
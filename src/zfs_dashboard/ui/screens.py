@@ -1,16 +1,50 @@
+from typing import Iterable, Optional
+
 from textual.app import ComposeResult
 from textual.screen import Screen
 from textual.widgets import Header, Footer, TabbedContent, TabPane, Label
 from textual.containers import Container, Horizontal, Vertical
 
 from ..models import Pool, Dataset
+from ..utils import humanize_bytes
 from .widgets import PoolOverview, VdevList, DatasetTreeWidget, DatasetDetails
 
+IOSTAT_FLUSH_INTERVAL = 0.5 # seconds between widget refreshes from iostat
+
 class DashboardScreen(Screen):
-    def __init__(self, pools: list[Pool]):
+    def __init__(self, pools: list[Pool], pool_names: Optional[Iterable[str]] = None):
         super().__init__()
         self.pools = pools
         self.dataset_filter = None
+        self._widgets = {}
+        self.index_pools(pool_names)
+
+    def index_pools(self, pool_names: Optional[Iterable[str]] = None):
+        # iostat lines only carry a name, so look them up by name instead of
+        # scanning every pool and vdev per line. Vdev names like mirror-0 repeat
+        # across pools, hence the (pool, vdev) key.
+        self._pools_by_name = {pool.name: pool for pool in self.pools}
+        # Every imported pool, including ones hidden by the pool filter: the
+        # iostat stream still reports them, and their vdev lines must not be
+        # taken for the previously reported pool's
+        self._pool_names = set(self._pools_by_name)
+        if pool_names is not None:
+            self._pool_names.update(pool_names)
+        self._vdevs_by_name = {
+            (pool.name, vdev.name): vdev for pool in self.pools for vdev in pool.vdevs
+        }
+        self._iostat_pool = None
+        self._dirty_pools = set()
+        self._dirty_vdev_lists = set()
+
+    def set_pools(self, pools: list[Pool], pool_names: Optional[Iterable[str]] = None):
+        self.pools = pools
+        self.index_pools(pool_names)
+
+        if len(self.pools) > 1:
+            self.update_all_tab()
+        for pool in self.pools:
+            self.update_pool_data(pool)
 
     def compose(self) -> ComposeResult:
         yield Header()
@@ -32,7 +66,7 @@ class DashboardScreen(Screen):
                                 classes="left-pane"
                             ),
                             Vertical(
-                                DatasetTreeWidget(id="tree-all"),
+                                DatasetTreeWidget("all", id="tree-all"),
                                 DatasetDetails(id="details-all"),
                                 classes="right-pane"
                             )
@@ -47,7 +81,7 @@ class DashboardScreen(Screen):
                                 classes="left-pane"
                             ),
                             Vertical(
-                                DatasetTreeWidget(id=f"tree-{pool.name}"),
+                                DatasetTreeWidget(pool.name, id=f"tree-{pool.name}"),
                                 DatasetDetails(id=f"details-{pool.name}"),
                                 classes="right-pane"
                             )
@@ -56,6 +90,19 @@ class DashboardScreen(Screen):
         yield Footer()
 
     def on_mount(self):
+        # Look the per-tab widgets up once; refreshes then reuse the references
+        self._widgets = {}
+        tab_names = [pool.name for pool in self.pools]
+        if len(self.pools) > 1:
+            tab_names.append("all")
+        for name in tab_names:
+            self._widgets[name] = {
+                "overview": self.query_one(f"#overview-{name}", PoolOverview),
+                "vdevs": self.query_one(f"#vdevs-{name}", VdevList),
+                "tree": self.query_one(f"#tree-{name}", DatasetTreeWidget),
+                "details": self.query_one(f"#details-{name}", DatasetDetails),
+            }
+
         # Populate initial data
         if len(self.pools) > 1:
             self.update_all_tab()
@@ -63,132 +110,130 @@ class DashboardScreen(Screen):
         for pool in self.pools:
             self.update_pool_data(pool)
 
+        self.set_interval(IOSTAT_FLUSH_INTERVAL, self.flush_iostat)
+
     def update_all_tab(self):
-        # Aggregate data
-        total_size = 0
-        total_alloc = 0
-        total_free = 0
+        # Structure of the "All" tab: every pool's vdevs and datasets
+        widgets = self._widgets.get("all")
+        if not widgets:
+            return
+
         all_vdevs = []
         all_datasets = []
-        worst_health = "ONLINE"
-        
-        # Helper to parse size strings to bytes (simplified)
-        # For now, just string concatenation or basic logic? 
-        # Real aggregation requires unit parsing.
-        # Let's just create a dummy pool with "Aggregated" strings for now
-        # or implement a proper size parser.
-        
-        # For simplicity in this iteration, I'll just list all vdevs and datasets
-        # and maybe skip the capacity bar or show an average?
-        # Let's try to do a best effort aggregation.
-        
         for pool in self.pools:
             all_vdevs.extend(pool.vdevs)
             all_datasets.extend(pool.datasets)
+
+        widgets["vdevs"].vdevs = all_vdevs
+        widgets["tree"].datasets = all_datasets
+        widgets["tree"].dataset_filter = self.dataset_filter
+        self.update_all_stats()
+
+    def update_all_stats(self):
+        # Aggregate pool totals for the "All" overview. The vdev list holds
+        # the same Vdev objects as the pool tabs, so it only needs a redraw.
+        widgets = self._widgets.get("all")
+        if not widgets:
+            return
+
+        worst_health = "ONLINE"
+        for pool in self.pools:
             if pool.health != "ONLINE":
                 worst_health = pool.health
+
+        size_bytes = sum(pool.size_bytes for pool in self.pools)
+        alloc_bytes = sum(pool.alloc_bytes for pool in self.pools)
+        free_bytes = sum(pool.free_bytes for pool in self.pools)
         
         # Create a dummy pool object for the overview
         agg_pool = Pool(
             name="All Pools",
             state=worst_health,
-            size="N/A", # TODO: Implement size parsing
-            alloc="N/A",
-            free="N/A",
+            size=humanize_bytes(size_bytes),
+            alloc=humanize_bytes(alloc_bytes),
+            free=humanize_bytes(free_bytes),
             frag="-",
-            cap="-",
+            cap=f"{alloc_bytes * 100 // size_bytes}%" if size_bytes else "-",
             health=worst_health,
-            vdevs=all_vdevs,
-            datasets=all_datasets
+            read_ops=sum(pool.read_ops for pool in self.pools),
+            write_ops=sum(pool.write_ops for pool in self.pools),
+            read_bytes=sum(pool.read_bytes for pool in self.pools),
+            write_bytes=sum(pool.write_bytes for pool in self.pools),
+            size_bytes=size_bytes,
+            alloc_bytes=alloc_bytes,
+            free_bytes=free_bytes
         )
-        
-        try:
-            overview = self.query_one("#overview-all", PoolOverview)
-            overview.pool = agg_pool
-            
-            vdevs = self.query_one("#vdevs-all", VdevList)
-            vdevs.vdevs = all_vdevs
-            
-            tree = self.query_one("#tree-all", DatasetTreeWidget)
-            tree.datasets = all_datasets
-        except Exception:
-            pass
+
+        # A fresh aggregate compares equal to the last one when the totals
+        # repeat, which would skip the watcher and the sparkline sample the
+        # pool tabs get on every flush; set it without comparing instead.
+        overview = widgets["overview"]
+        overview.set_reactive(PoolOverview.pool, agg_pool)
+        overview.update_stats()
+        widgets["vdevs"].update_vdevs()
 
     def update_pool_data(self, pool: Pool):
         # Update widgets for this pool
-        try:
-            overview = self.query_one(f"#overview-{pool.name}", PoolOverview)
-            overview.pool = pool
-            
-            vdevs = self.query_one(f"#vdevs-{pool.name}", VdevList)
-            vdevs.vdevs = pool.vdevs
-            
-            tree = self.query_one(f"#tree-{pool.name}", DatasetTreeWidget)
-            tree.datasets = pool.datasets
-            if self.dataset_filter:
-                tree.dataset_filter = self.dataset_filter
-        except Exception:
-            pass # Widget might not exist if tab not created yet
+        widgets = self._widgets.get(pool.name)
+        if not widgets:
+            return # No tab for this pool (e.g. imported after startup)
+        widgets["overview"].pool = pool
+        widgets["vdevs"].vdevs = pool.vdevs
+        widgets["tree"].datasets = pool.datasets
+        widgets["tree"].dataset_filter = self.dataset_filter
 
     def on_dataset_tree_widget_selected(self, message: DatasetTreeWidget.Selected):
-        # Find which pool this belongs to (hacky, but works for now)
-        # Ideally the message should carry context or we search
-        # But since we have unique IDs for details widget:
-        # We need to find the details widget that corresponds to the active tab or the tree that sent the message
-        
-        # The message bubbles up from the tree.
-        # We can look at message.control.id to find the pool name
-        tree_id = message.tree_id # e.g. tree-tank
-        if tree_id and tree_id.startswith("tree-"):
-            pool_name = tree_id.split("-", 1)[1]
-            details = self.query_one(f"#details-{pool_name}", DatasetDetails)
-            details.dataset = message.dataset
+        # The tree tells us which tab it lives in, so show the dataset in that tab's details
+        widgets = self._widgets.get(message.pool_name)
+        if widgets:
+            widgets["details"].dataset = message.dataset
 
     def update_iostat_data(self, stats):
         # stats: (name, read_ops, write_ops, read_bytes, write_bytes)
+        # Only the model is updated here; widgets are refreshed by flush_iostat.
         name, r_ops, w_ops, r_bytes, w_bytes = stats
-        
-        # We need to find the pool or vdev with this name.
-        # Since we don't know if it's a pool or vdev easily without context,
-        # we can try to find widgets that match.
-        # Pools have IDs like `overview-{pool_name}`
-        # Vdevs are inside `VdevList`, which we need to access.
-        
-        # 1. Check if it's a pool
-        # We can iterate over our pools to see if name matches
-        for pool in self.pools:
-            if pool.name == name:
-                # Update pool stats
-                pool.read_ops = r_ops
-                pool.write_ops = w_ops
-                pool.read_bytes = r_bytes
-                pool.write_bytes = w_bytes
-                
-                # Update UI
-                try:
-                    overview = self.query_one(f"#overview-{pool.name}", PoolOverview)
-                    overview.update_stats()
-                except Exception:
-                    pass
-                    
-                # Also update "All" tab if it exists
-                if len(self.pools) > 1:
-                    self.update_all_tab()
-                return
-
-            # 2. Check if it's a vdev in this pool
-            for vdev in pool.vdevs:
-                if vdev.name == name:
-                    vdev.read_ops = r_ops
-                    vdev.write_ops = w_ops
-                    vdev.read_bytes = r_bytes
-                    vdev.write_bytes = w_bytes
-                    
-                    # Update VdevList
-                    try:
-                        vdev_list = self.query_one(f"#vdevs-{pool.name}", VdevList)
-                        vdev_list.update_vdevs()
-                    except Exception:
-                        pass
-                    return
 
+        # `zpool iostat -v` prints each pool followed by its vdevs,
+        # so a pool line tells us which pool the next vdev lines belong to.
+        pool = self._pools_by_name.get(name)
+        if pool:
+            self._iostat_pool = pool
+            pool.read_ops = r_ops
+            pool.write_ops = w_ops
+            pool.read_bytes = r_bytes
+            pool.write_bytes = w_bytes
+            self._dirty_pools.add(pool.name)
+            return
+        if name in self._pool_names:
+            # A pool that isn't shown; skip its vdevs
+            self._iostat_pool = None
+            return
+
+        if not self._iostat_pool:
+            return
+        vdev = self._vdevs_by_name.get((self._iostat_pool.name, name))
+        if vdev:
+            vdev.read_ops = r_ops
+            vdev.write_ops = w_ops
+            vdev.read_bytes = r_bytes
+            vdev.write_bytes = w_bytes
+            self._dirty_vdev_lists.add(self._iostat_pool.name)
+
+    def flush_iostat(self):
+        # One widget refresh per pool per flush instead of one per iostat line
+        dirty_pools, self._dirty_pools = self._dirty_pools, set()
+        dirty_vdev_lists, self._dirty_vdev_lists = self._dirty_vdev_lists, set()
+
+        for pool_name in dirty_pools:
+            widgets = self._widgets.get(pool_name)
+            if widgets:
+                widgets["overview"].update_stats()
+
+        for pool_name in dirty_vdev_lists:
+            widgets = self._widgets.get(pool_name)
+            if widgets:
+                widgets["vdevs"].update_vdevs()
+
+        # Also update "All" tab if it exists
+        if dirty_pools or dirty_vdev_lists:
+            self.update_all_stats()
@@ -1,12 +1,21 @@
+import re
+from collections import deque
+from functools import partial
+from typing import Optional
+
 from textual.app import ComposeResult
 from textual.widgets import Static, Tree, ProgressBar, DataTable, Label, Sparkline, Input
 from textual.containers import Vertical, Horizontal, Grid
 from textual.reactive import reactive
 from textual.message import Message
+from textual.timer import Timer
 
 from ..models import Pool, Vdev, Dataset
 from ..utils import humanize_bytes
 
+HISTORY_LENGTH = 60 # samples kept for the IOPS sparklines
+SEARCH_DEBOUNCE = 0.15 # seconds of typing pause before the tree is filtered
+
 class PoolOverview(Static):
     pool = reactive(None)
 
@@ -44,21 +53,20 @@ class PoolOverview(Static):
             
             # Update Sparklines
             # We need to maintain history. Since this widget persists, we can store it in self.
+            # deque(maxlen) drops the oldest sample on append.
             if not hasattr(self, "read_history"):
-                self.read_history = []
-                self.write_history = []
+                self.read_history = deque(maxlen=HISTORY_LENGTH)
+                self.write_history = deque(maxlen=HISTORY_LENGTH)
             
             self.read_history.append(pool.read_ops)
             self.write_history.append(pool.write_ops)
-            if len(self.read_history) > 60:
-                self.read_history.pop(0)
-                self.write_history.pop(0)
                 
-            self.query_one("#read-ops-spark", Sparkline).data = self.read_history
-            self.query_one("#write-ops-spark", Sparkline).data = self.write_history
+            self.query_one("#read-ops-spark", Sparkline).data = list(self.read_history)
+            self.query_one("#write-ops-spark", Sparkline).data = list(self.write_history)
 
 class VdevList(Static):
     vdevs = reactive([])
+    _last_rows: Optional[list[tuple]] = None
 
     def compose(self) -> ComposeResult:
         yield Label("VDEVs", classes="header")
@@ -73,10 +81,8 @@ class VdevList(Static):
         self.watch_vdevs(self.vdevs)
 
     def watch_vdevs(self, vdevs: list[Vdev]):
-        table = self.query_one(DataTable)
-        table.clear()
-        for vdev in vdevs:
-            table.add_row(
+        rows = [
+            (
                 vdev.name,
                 vdev.state,
                 str(vdev.read),
@@ -88,91 +94,205 @@ class VdevList(Static):
                 humanize_bytes(vdev.read_bytes),
                 humanize_bytes(vdev.write_bytes)
             )
+            for vdev in vdevs
+        ]
+        # Idle pools report the same numbers every second, skip the redraw
+        if rows == self._last_rows:
+            return
+
+        table = self.query_one(DataTable)
+        table.clear()
+        table.add_rows(rows)
+        self._last_rows = rows
 
 class DatasetTreeWidget(Static):
     datasets = reactive([])
     search_query = reactive("")
-    dataset_filter = reactive("")
+    dataset_filter = reactive(None) # compiled re.Pattern from the CLI
+    _search_re: Optional[re.Pattern] = None
+    _search_timer: Optional[Timer] = None
 
     class Selected(Message):
-        def __init__(self, dataset: Dataset, tree_id: str):
+        def __init__(self, dataset: Dataset, pool_name: str):
             self.dataset = dataset
-            self.tree_id = tree_id
+            self.pool_name = pool_name
             super().__init__()
 
+    def __init__(self, pool_name: str, **kwargs):
+        super().__init__(**kwargs)
+        # Tab this tree belongs to (pool name or "all"), carried on Selected
+        self.pool_name = pool_name
+        # Pre-order flattened view of `datasets`, see flatten_datasets
+        self._flat: list[Dataset] = []
+        self._names: list[str] = []
+        self._parents: list[int] = []
+        self._ends: list[int] = []
+        # Tree node per flat index (None while hidden) and current visibility
+        self._dataset_nodes: list = []
+        self._visible: list[bool] = []
+
     def compose(self) -> ComposeResult:
         yield Input(placeholder="Search datasets...", id="search-input")
         yield Tree("Datasets", id="dataset-tree")
 
     def on_input_changed(self, event: Input.Changed):
-        self.search_query = event.value
-        self.rebuild_tree()
+        # Debounce: only the last keystroke of a burst updates the tree
+        if self._search_timer:
+            self._search_timer.stop()
+        self._search_timer = self.set_timer(SEARCH_DEBOUNCE, partial(self.apply_search, event.value))
+
+    def apply_search(self, query: str):
+        self._search_timer = None
+        self.search_query = query
+        self.update_visibility()
+
+    def watch_search_query(self, query: str):
+        # Compile once per query so matching each node is a single search
+        self._search_re = re.compile(re.escape(query), re.IGNORECASE) if query else None
 
     def watch_datasets(self, datasets: list[Dataset]):
+        self.flatten_datasets()
         self.rebuild_tree()
 
-    def watch_dataset_filter(self, filter_str: str):
-        self.rebuild_tree()
+    def watch_dataset_filter(self, pattern: Optional[re.Pattern]):
+        self.update_visibility()
+
+    def flatten_datasets(self):
+        # Flatten the tree once per data refresh into parallel lists in
+        # pre-order (parents before children). Searching then only scans
+        # the name list instead of walking Dataset objects per keystroke.
+        flat = []
+        parents = []
+        # Explicit stack instead of recursion: deep hierarchies stay cheap
+        # and can't hit the recursion limit. Reversed so children pop off
+        # in their listed order.
+        stack = [(-1, root) for root in reversed(self.datasets)]
+        while stack:
+            parent, dataset = stack.pop()
+            index = len(flat)
+            flat.append(dataset)
+            parents.append(parent)
+            stack.extend((index, child) for child in reversed(dataset.children))
+
+        # A subtree is the contiguous range index..ends[index]
+        ends = list(range(1, len(flat) + 1))
+        for index in range(len(flat) - 1, -1, -1):
+            parent = parents[index]
+            if parent >= 0 and ends[index] > ends[parent]:
+                ends[parent] = ends[index]
 
-    def rebuild_tree(self):
+        self._flat = flat
+        self._names = [dataset.name for dataset in flat]
+        self._parents = parents
+        self._ends = ends
+
+    def compute_visible(self) -> list[bool]:
+        # Visible if this node or any of its descendants match. Children
+        # always sit after their parent, so one backwards sweep carries a
+        # match all the way up to the root.
+        visible = [self.matches(name) for name in self._names]
+        parents = self._parents
+        for index in range(len(visible) - 1, -1, -1):
+            if visible[index] and parents[index] >= 0:
+                visible[parents[index]] = True
+        return visible
+
+    def rebuild_tree(self, visible: Optional[list[bool]] = None):
         tree = self.query_one(Tree)
         tree.clear()
         tree.root.expand()
-        
-        for root in self.datasets:
-            self._add_node(tree.root, root)
-
-    def _add_node(self, parent_node, dataset: Dataset):
-        # Check if this node or any of its children match the query
-        if self.matches(dataset) or self.has_matching_child(dataset):
-            # Format label with columns
-            # Name | Used | Avail | Compress | Mount
-            # We use fixed width for simplicity, or just append info
-            # Name is the tree node, so indentation is handled by Tree.
-            # We just append the other columns.
-            # Note: Tree indentation eats into width.
-            
-            # Simple formatting:
-            label = f"{dataset.name} [dim]{dataset.used} {dataset.avail} {dataset.compression} {dataset.mountpoint}[/]"
-            
+
+        if visible is None:
+            visible = self.compute_visible()
+        nodes = [None] * len(self._flat)
+        for index in range(len(self._flat)):
+            if visible[index]:
+                # Pre-order: the parent exists and its earlier children are
+                # already in place, so appending keeps the listed order
+                nodes[index] = self._add_node(tree, nodes, index)
+
+        self._dataset_nodes = nodes
+        self._visible = visible
+
+    def update_visibility(self):
+        """Show/hide existing nodes for a new search or filter instead of rebuilding."""
+        if len(self._dataset_nodes) != len(self._flat):
+            self.rebuild_tree()
+            return
+
+        visible = self.compute_visible()
+        nodes = self._dataset_nodes
+
+        # Re-adding a node costs about as much as adding it in a rebuild, so
+        # when most of the tree comes back (e.g. clearing a search) start over
+        kept = sum(1 for index, node in enumerate(nodes) if node is not None and visible[index])
+        if sum(visible) - kept > kept:
+            self.rebuild_tree(visible)
+            return
+
+        tree = self.query_one(Tree)
+        # Hidden nodes have no visible descendants, so removing a node
+        # takes its whole (now hidden) subtree with it.
+        for index, node in enumerate(nodes):
+            if node is not None and not visible[index]:
+                node.remove()
+                for descendant in range(index, self._ends[index]):
+                    nodes[descendant] = None
+
+        # Pre-order again, so a parent is back before its children and
+        # each parent's children come up in listed order: counting the shown
+        # ones gives a re-added node its position without searching the
+        # siblings for a neighbour (Tree's before/after=node does an index())
+        positions = {}
+        parents = self._parents
+        for index, node in enumerate(nodes):
+            if visible[index]:
+                parent = parents[index]
+                position = positions.get(parent, 0)
+                positions[parent] = position + 1
+                if node is None:
+                    nodes[index] = self._add_node(tree, nodes, index, position)
+                elif self.search_query and not node.is_expanded:
+                    # Expand if searching, otherwise nodes keep their state
+                    node.expand()
+
+        self._visible = visible
+
+    def _add_node(self, tree: Tree, nodes: list, index: int, position: Optional[int] = None):
+        dataset = self._flat[index]
+        parent = self._parents[index]
+        parent_node = tree.root if parent < 0 else nodes[parent]
+
+        # The label (name plus dimmed columns) is formatted by the parser.
+        # Name is the tree node, so indentation is handled by Tree.
+        # Note: Tree indentation eats into width.
+        label = dataset.label or dataset.name
+        if position is None:
             node = parent_node.add(label, data=dataset)
-            
-            # Expand if searching
-            if self.search_query:
-                node.expand()
-            elif len(dataset.children) > 10:
-                node.collapse()
-            else:
-                node.expand()
-                
-            for child in dataset.children:
-                self._add_node(node, child)
+        else:
+            node = parent_node.add(label, data=dataset, before=position)
+
+        # Expand if searching
+        if self.search_query:
+            node.expand()
+        elif len(dataset.children) > 10:
+            node.collapse()
+        else:
+            node.expand()
+        return node
 
-    def matches(self, dataset: Dataset) -> bool:
+    def matches(self, name: str) -> bool:
         # Check CLI filter
-        if self.dataset_filter:
-            import re
-            try:
-                if not re.search(self.dataset_filter, dataset.name):
-                    return False
-            except re.error:
-                pass
+        if self.dataset_filter and not self.dataset_filter.search(name):
+            return False
         
-        if not self.search_query:
+        if not self._search_re:
             return True
-        return self.search_query.lower() in dataset.name.lower()
-
-    def has_matching_child(self, dataset: Dataset) -> bool:
-        if not self.search_query:
-            return True # If no query, children "match" (are visible)
-        for child in dataset.children:
-            if self.matches(child) or self.has_matching_child(child):
-                return True
-        return False
+        return self._search_re.search(name) is not None
 
     def on_tree_node_selected(self, event: Tree.NodeSelected):
         if event.node.data:
-            self.post_message(self.Selected(event.node.data, self.id))
+            self.post_message(self.Selected(event.node.data, self.pool_name))
 
 class DatasetDetails(Static):
     dataset = reactive(None)
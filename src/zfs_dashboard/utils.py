@@ -1,14 +1,17 @@
-def humanize_bytes(value: float) -> str:
+from functools import lru_cache
+
+SUFFIXES = ('B', 'K', 'M', 'G', 'T', 'P', 'E', 'Z', 'Y')
+
+@lru_cache(maxsize=4096)
+def humanize_bytes(value: int) -> str:
     """
     Convert a byte count into a human-readable string (e.g., 1K, 1M, 1G).
+    The suffix index is log1024 of the value, i.e. bit_length() // 10.
+    Cached because iostat keeps reporting the same counts on quiet pools.
     """
+    value = int(value)
     if value == 0:
         return "0B"
-    
-    suffixes = ['B', 'K', 'M', 'G', 'T', 'P', 'E', 'Z', 'Y']
-    i = 0
-    while value >= 1024 and i < len(suffixes) - 1:
-        value /= 1024.0
-        i += 1
-        
-    return f"{value:.1f}{suffixes[i]}"
+
+    i = min((abs(value).bit_length() - 1) // 10, len(SUFFIXES) - 1)
+    return f"{value / (1 << (i * 10)):.1f}{SUFFIXES[i]}"
@@ -1,236 +1,273 @@
-import subprocess
+import logging
+import os
 import re
-from typing import List, Dict, Optional
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Iterable, Iterator, Optional, Union
 from .models import Pool, Vdev, Dataset, Snapshot
+from .utils import humanize_bytes
+
+logger = logging.getLogger(__name__)
+
+ZPOOL_CACHE_FILE = '/etc/zfs/zpool.cache'
+ZFS_LIST_CACHE_DIR = '/etc/zfs/zfs-list.cache'
+KSTAT_DIR = '/proc/spl/kstat/zfs'
+
+# Vdev type by the first six characters of its name; anything else is a disk
+_VDEV_TYPES = {
+    'mirror': 'mirror',
+    'raidz-': 'raidz',
+    'raidz1': 'raidz',
+    'raidz2': 'raidz',
+    'raidz3': 'raidz',
+}
+
+# Resolved once instead of searching PATH on every spawn
+ZPOOL = shutil.which('zpool') or 'zpool'
+ZFS = shutil.which('zfs') or 'zfs'
+# C locale keeps numbers and dates in the output stable for the parsers
+COMMAND_ENV = dict(os.environ, LC_ALL='C')
 
-def run_command(command: List[str]) -> str:
+ZFS_LIST_COMMAND = [ZFS, 'list', '-H', '-t', 'filesystem,volume', '-o', 'name,used,avail,refer,mountpoint,compression']
+ZFS_SNAPSHOTS_COMMAND = [ZFS, 'list', '-H', '-t', 'snapshot', '-o', 'name,used']
+
+IOSTAT_FIELDS = ('read_ops', 'write_ops', 'read_bytes', 'write_bytes')
+
+# `zpool status -p` lines we care about; error counts are plain integers,
+# which also rules out the NAME STATE READ WRITE CKSUM header.
+_STATUS_RE = re.compile(
+    r'\s*(?:'
+    r'pool: (?P<pool>\S+)'
+    r'|(?P<config>config:)'
+    r'|(?P<name>\S+)\s+(?P<state>\S+)\s+(?P<read>\d+)\s+(?P<write>\d+)\s+(?P<cksum>\d+)(?!\S)'
+    r')'
+)
+
+def run_command_lines(command: List[str]) -> Iterator[str]:
+    """
+    Streams the stdout of `command` line by line, so parsing overlaps with
+    the command still running and the full output is never held in memory.
+    """
     try:
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        print(f"Error running command {' '.join(command)}: {e}")
-        return ""
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, env=COMMAND_ENV)
     except FileNotFoundError:
         # For testing/development on non-ZFS systems
-        return ""
+        return
 
-def parse_zpool_list(output: str) -> List[Pool]:
+    with process:
+        yield from process.stdout
+    if process.returncode:
+        e = subprocess.CalledProcessError(process.returncode, command)
+        logger.error("Error running command %s: %s", command, e)
+
+def _lines(output: Union[str, Iterable[str]]) -> Iterable[str]:
+    # Parsers take a stream from run_command_lines, or a whole string (tests)
+    if isinstance(output, str):
+        return output.splitlines()
+    return output
+
+def _size_field(value: str) -> tuple[str, int]:
+    """Returns (display string, bytes) for a size column, raw with -p or human without."""
+    if value.isdigit():
+        size = int(value)
+        return humanize_bytes(size), size
+    return value, 0
+
+def _percent_field(value: str) -> str:
+    # -p drops the % sign
+    return f"{value}%" if value.isdigit() else value
+
+def parse_zpool_list(output: Union[str, Iterable[str]]) -> List[Pool]:
     """
-    Parses `zpool list -H -o name,size,alloc,free,frag,cap,health,altroot`
+    Parses `zpool list -H -p -o name,size,alloc,free,frag,cap,health,altroot`
+    With -p sizes are exact byte counts, kept in *_bytes next to a humanized string.
     """
     pools = []
-    if not output:
-        return pools
-        
-    for line in output.strip().split('\n'):
-        parts = line.split('\t')
+    append = pools.append
+    for line in _lines(output):
+        parts = line.rstrip('\n').split('\t')
         if len(parts) >= 8:
-            pools.append(Pool(
+            size, size_bytes = _size_field(parts[1])
+            alloc, alloc_bytes = _size_field(parts[2])
+            free, free_bytes = _size_field(parts[3])
+            append(Pool(
                 name=parts[0],
-                size=parts[1],
-                alloc=parts[2],
-                free=parts[3],
-                frag=parts[4],
-                cap=parts[5],
+                size=size,
+                alloc=alloc,
+                free=free,
+                frag=_percent_field(parts[4]),
+                cap=_percent_field(parts[5]),
                 health=parts[6],
                 altroot=parts[7],
-                state=parts[6] # Health is often used as state in list, but status gives more detail
+                state=parts[6], # Health is often used as state in list, but status gives more detail
+                size_bytes=size_bytes,
+                alloc_bytes=alloc_bytes,
+                free_bytes=free_bytes
             ))
     return pools
 
-def parse_zpool_status(output: str) -> Dict[str, List[Vdev]]:
+def parse_zpool_status(output: Union[str, Iterable[str]]) -> Dict[str, List[Vdev]]:
     """
-    Parses `zpool status` to extract vdev information.
+    Parses `zpool status -p` to extract vdev information.
+    -p prints exact error counts instead of abbreviations like 1.2K.
     Returns a dictionary mapping pool names to a list of Vdevs.
-    This is a complex parser as `zpool status` output is structured text.
+    A single precompiled regex classifies each line: `pool:` header,
+    `config:` marker, or a NAME STATE READ WRITE CKSUM row. Everything else
+    (NAME header, scan/errors lines, section names) doesn't match.
     """
     vdevs_by_pool = {}
     current_pool = None
+    vdevs = None # vdevs_by_pool[current_pool]
     in_config = False
+    match = _STATUS_RE.match
+    vdev_types = _VDEV_TYPES
     
-    lines = output.split('\n')
-    for line in lines:
-        line = line.rstrip()
-        stripped = line.strip()
-        
-        if stripped.startswith("pool:"):
-            current_pool = stripped.split(":")[1].strip()
-            vdevs_by_pool[current_pool] = []
-            in_config = False
+    for line in _lines(output):
+        m = match(line)
+        if not m:
             continue
-            
-        if stripped.startswith("config:"):
+
+        if m['pool']:
+            current_pool = m['pool']
+            vdevs = vdevs_by_pool[current_pool] = []
+            in_config = False
+        elif m['config']:
             in_config = True
-            continue
-            
-        if not in_config or not current_pool:
-            continue
-            
-        # Skip headers and errors line
-        if stripped.startswith("NAME") or stripped.startswith("errors:") or not stripped:
-            continue
-            
-        # Basic parsing of config lines
-        # Format usually: NAME  STATE  READ WRITE CKSUM
-        # Indentation matters for hierarchy, but for now we just list them
-        # We might need to refine this to handle mirrors/raidz properly
-        
-        parts = stripped.split()
-        if len(parts) >= 5:
-            name = parts[0]
-            state = parts[1]
-            try:
-                read = int(parts[2])
-                write = int(parts[3])
-                cksum = int(parts[4])
-            except ValueError:
-                # Might be errors or other info
-                read, write, cksum = 0, 0, 0
-                
-            # Determine type based on name (mirror, raidz, etc)
-            vdev_type = "disk"
-            if name.startswith("mirror"):
-                vdev_type = "mirror"
-            elif name.startswith("raidz"):
-                vdev_type = "raidz"
-            elif name == current_pool:
-                 # This is the root vdev (pool name itself in config)
-                 vdev_type = "root"
-            
-            # Don't add the root pool entry as a vdev if it's just the container
-            if name != current_pool:
-                vdevs_by_pool[current_pool].append(Vdev(
-                    name=name,
-                    state=state,
-                    read=read,
-                    write=write,
-                    cksum=cksum,
-                    type=vdev_type
-                ))
+        elif in_config and current_pool:
+            # Indentation matters for hierarchy, but for now we just list them
+            name = m['name']
+            # Don't add the root pool entry as a vdev, it's just the container
+            if name == current_pool:
+                continue
+
+            # Determine type based on name (mirror-0, raidz2-1, ...)
+            vdev_type = vdev_types.get(name[:6], "disk")
+
+            vdevs.append(Vdev(
+                name=name,
+                state=m['state'],
+                read=int(m['read']),
+                write=int(m['write']),
+                cksum=int(m['cksum']),
+                type=vdev_type
+            ))
                 
     return vdevs_by_pool
 
-def parse_zfs_list(output: str) -> List[Dataset]:
+def parse_zfs_list(output: Union[str, Iterable[str]]) -> List[Dataset]:
     """
-    Parses `zfs list -H -p -o name,used,avail,refer,mountpoint,compression,type`
-    Using -p for parsable (exact numbers) might be better, but user wants human readable?
-    Let's stick to default units for now or -H without -p if we want human readable strings.
-    The requirement says "size/quota", "used", "available".
-    Let's use `zfs list -H -o name,used,avail,refer,mountpoint,compression,type`
+    Parses `zfs list -H -t filesystem,volume -o name,used,avail,refer,mountpoint,compression`
+    Human readable sizes (no -p) are kept, they are shown as is.
     """
     datasets = []
-    if not output:
-        return datasets
-
-    for line in output.strip().split('\n'):
-        parts = line.split('\t')
-        if len(parts) >= 7:
-            # We only care about filesystems and volumes usually, but type is in parts[6]
-            ds_type = parts[6]
-            if ds_type in ('filesystem', 'volume'):
-                datasets.append(Dataset(
-                    name=parts[0],
-                    used=parts[1],
-                    avail=parts[2],
-                    refer=parts[3],
-                    mountpoint=parts[4],
-                    compression=parts[5]
-                ))
+    append = datasets.append
+    for line in _lines(output):
+        parts = line.rstrip('\n').split('\t')
+        if len(parts) >= 6:
+            name, used, avail, refer, mountpoint, compression = parts[:6]
+            append(Dataset(
+                name=name,
+                used=used,
+                avail=avail,
+                refer=refer,
+                mountpoint=mountpoint,
+                compression=compression,
+                # Name | Used | Avail | Compress | Mount
+                label=f"{name} [dim]{used} {avail} {compression} {mountpoint}[/]"
+            ))
     return datasets
 
-def parse_zfs_snapshots(output: str) -> Dict[str, List[Snapshot]]:
+def parse_zfs_snapshots(output: Union[str, Iterable[str]]) -> Dict[str, List[Snapshot]]:
     """
     Parses `zfs list -H -t snapshot -o name,used`
     Returns dict mapping dataset name to snapshots.
     """
     snapshots_by_dataset = {}
-    if not output:
-        return snapshots_by_dataset
-        
-    for line in output.strip().split('\n'):
-        parts = line.split('\t')
-        if len(parts) >= 2:
-            full_name = parts[0]
-            used = parts[1]
-            if '@' in full_name:
-                dataset_name, snap_name = full_name.split('@', 1)
-                if dataset_name not in snapshots_by_dataset:
-                    snapshots_by_dataset[dataset_name] = []
-                snapshots_by_dataset[dataset_name].append(Snapshot(name=snap_name, used=used))
+    last_dataset = None
+    snapshots = None
+    for line in _lines(output):
+        # Only two fields: partition avoids building a list per snapshot
+        full_name, tab, used = line.rstrip('\n').partition('\t')
+        if tab:
+            dataset_name, at, snap_name = full_name.partition('@')
+            if at:
+                # Snapshots of a dataset are listed together, reuse its list
+                if dataset_name != last_dataset:
+                    snapshots = snapshots_by_dataset.get(dataset_name)
+                    if snapshots is None:
+                        snapshots = snapshots_by_dataset[dataset_name] = []
+                    last_dataset = dataset_name
+                # Sizes repeat a lot ("0B", "96K", ...), share one string each
+                snapshots.append(Snapshot(name=snap_name, used=sys.intern(used)))
                 
     return snapshots_by_dataset
 
 def build_dataset_tree(datasets: List[Dataset]) -> List[Dataset]:
     """
     Organizes a flat list of datasets into a tree structure based on names.
-    Assumes datasets are sorted by name (which zfs list usually does).
+    Assumes datasets are sorted by name (which zfs list usually does), so a
+    dataset's parent is almost always on the stack of its preceding ancestors.
     """
-    # Map names to dataset objects
-    ds_map = {ds.name: ds for ds in datasets}
+    ds_map = {}
     roots = []
+    # (dataset, "name/") for the current chain of ancestors
+    stack = []
     
     for ds in datasets:
-        if '/' in ds.name:
-            parent_name = ds.name.rsplit('/', 1)[0]
-            if parent_name in ds_map:
-                ds_map[parent_name].children.append(ds)
+        name = ds.name
+        while stack and not name.startswith(stack[-1][1]):
+            stack.pop()
+
+        if stack and name.rfind('/') == len(stack[-1][1]) - 1:
+            stack[-1][0].children.append(ds)
+        elif '/' in name:
+            # strcmp order can put a sibling like tank/a-b between tank/a and
+            # tank/a/c, which pops the parent off the stack; look it up instead
+            parent = ds_map.get(name[:name.rfind('/')])
+            if parent:
+                parent.children.append(ds)
             else:
                 # Parent not found (maybe not listed?), treat as root
                 roots.append(ds)
         else:
             roots.append(ds)
+
+        ds_map[name] = ds
+        stack.append((ds, name + '/'))
             
     return roots
 
-def parse_iostat_line(line: str) -> Optional[tuple[str, str, int, int, int, int]]:
+def parse_iostat_line(line: str) -> Optional[tuple[str, int, int, int, int]]:
     """
-    Parses a single line from `zpool iostat -H -p -y 1`.
-    Format: pool_name  alloc  free  read_ops  write_ops  read_bytes  write_bytes
-    Or:     vdev_name  alloc  free  read_ops  write_ops  read_bytes  write_bytes
-    
-    Returns: (name, type_hint, read_ops, write_ops, read_bytes, write_bytes)
-    type_hint is 'pool' or 'vdev' based on context (caller needs to track).
-    Actually, `zpool iostat -H` prints flat lines.
-    We need to know the structure.
-    But usually it prints:
-    pool_name ...
-      vdev ...
-    
-    With -H, indentation is preserved?
-    Let's check `zpool iostat -H` behavior.
-    Usually -H removes headers and separates with tabs.
-    It DOES NOT preserve indentation usually.
-    Wait, if indentation is lost, we can't distinguish pool from vdev easily if names are similar.
-    However, the order is always Pool -> Vdevs.
-    
-    Let's assume the caller handles the hierarchy or we just return the raw stats and name.
+    Parses a single line from `zpool iostat -v -H -p -y 1`.
+    Format: name  alloc  free  read_ops  write_ops  read_bytes  write_bytes
+    -H guarantees tab separated fields, so a plain split is all we need.
+    Pool and vdev lines look the same; the caller tracks which pool the
+    vdev lines that follow a pool line belong to.
+
+    Returns: (name, read_ops, write_ops, read_bytes, write_bytes)
+    or None for blank/unparsable lines.
     """
     parts = line.strip().split('\t')
-    if len(parts) < 7:
+    if len(parts) < 7 or not parts[0]:
         return None
-        
-    name = parts[0]
+
     try:
         # parts[1] alloc, parts[2] free
-        read_ops = int(parts[3])
-        write_ops = int(parts[4])
-        read_bytes = int(parts[5])
-        write_bytes = int(parts[6])
-        return (name, read_ops, write_ops, read_bytes, write_bytes)
-    except (ValueError, IndexError):
+        read_ops, write_ops, read_bytes, write_bytes = map(int, parts[3:7])
+    except ValueError:
         return None
+    return (parts[0], read_ops, write_ops, read_bytes, write_bytes)
 
-def parse_zpool_iostat(output: str) -> Dict[str, Dict[str, dict]]:
+def parse_zpool_iostat(output: Union[str, Iterable[str]]) -> Dict[str, Dict[str, dict]]:
 
     """
     Parses `zpool iostat -v -p` (using -p for exact numbers)
     Returns nested dict: pool -> vdev -> {read_ops, write_ops, read_bytes, write_bytes}
     """
     stats = {}
-    if not output:
-        return stats
-        
-    lines = output.strip().split('\n')
     # Headers usually take 1-2 lines. -v output structure:
     #              capacity     operations    bandwidth
     # pool        alloc   free   read  write   read  write
@@ -244,7 +281,7 @@ def parse_zpool_iostat(output: str) -> Dict[str, Dict[str, dict]]:
     data_started = False
     current_pool = None
     
-    for line in lines:
+    for line in _lines(output):
         if "----------" in line:
             data_started = True
             continue
@@ -252,7 +289,11 @@ def parse_zpool_iostat(output: str) -> Dict[str, Dict[str, dict]]:
         if not data_started:
             continue
             
-        parts = line.split()
+        # `zpool iostat -v` lists each pool unindented, followed by its
+        # indented vdevs; split() drops the indentation, so check it first
+        is_pool = line[:1] not in (' ', '\t')
+        # Only the first seven columns are used (latency columns may follow)
+        parts = line.split(None, 7)
         if len(parts) < 7:
             continue
             
@@ -262,86 +303,137 @@ def parse_zpool_iostat(output: str) -> Dict[str, Dict[str, dict]]:
         
         name = parts[0]
         try:
-            read_ops = int(parts[3])
-            write_ops = int(parts[4])
-            read_bytes = int(parts[5])
-            write_bytes = int(parts[6])
-        except (ValueError, IndexError):
+            # The four counters are contiguous, convert them in one go
+            counters = dict(zip(IOSTAT_FIELDS, map(int, parts[3:7])))
+        except ValueError:
             continue
             
-        # Identify if it's a pool or vdev
-        # Indentation in `zpool iostat -v` is 2 spaces for vdevs usually
-        # But `split()` removes indentation.
-        # However, the order is hierarchical.
-        
-        # If we track known pools, we can guess.
-        # But we don't have the list of pools here easily unless passed.
-        # A heuristic: if it's a pool name, it's a pool.
-        # But we don't know pool names here.
-        
-        # Actually, `zpool iostat -v` lists the pool then its vdevs.
-        # We can assume top level is pool, indented is vdev.
-        # But we lost indentation with `split()`.
-        # Let's check indentation from original line.
-        indent = len(line) - len(line.lstrip())
-        
-        if indent == 0:
+        if is_pool:
             current_pool = name
             if current_pool not in stats:
                 stats[current_pool] = {}
             # Store pool stats under "root" or similar key, or just map pool name to stats
-            stats[current_pool]["__pool__"] = {
-                "read_ops": read_ops, "write_ops": write_ops,
-                "read_bytes": read_bytes, "write_bytes": write_bytes
-            }
+            stats[current_pool]["__pool__"] = counters
         elif current_pool:
-            stats[current_pool][name] = {
-                "read_ops": read_ops, "write_ops": write_ops,
-                "read_bytes": read_bytes, "write_bytes": write_bytes
-            }
+            stats[current_pool][name] = counters
             
     return stats
 
 def get_static_data() -> List[Pool]:
     """
     Fetches static structure: Pools, Vdevs, Datasets.
-    Does NOT fetch realtime IO stats.
+    Does NOT fetch realtime IO stats; see ZfsCache for reloading only on change.
     """
-    # 1. Get Pools
-    pool_list_out = run_command(['zpool', 'list', '-H', '-o', 'name,size,alloc,free,frag,cap,health,altroot'])
-    pools = parse_zpool_list(pool_list_out)
-    
-    # 2. Get Vdevs
-    status_out = run_command(['zpool', 'status'])
-    vdevs_map = parse_zpool_status(status_out)
-    
-    # 3. Get Datasets
-    zfs_list_out = run_command(['zfs', 'list', '-H', '-o', 'name,used,avail,refer,mountpoint,compression,type'])
-    all_datasets = parse_zfs_list(zfs_list_out)
+    # The four commands are independent and mostly wait on the kernel,
+    # so run them side by side: wall time is roughly the slowest one.
+    # Each worker parses its command's output as it streams in.
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        # 1. Get Pools
+        pool_list_future = executor.submit(parse_zpool_list, run_command_lines([ZPOOL, 'list', '-H', '-p', '-o', 'name,size,alloc,free,frag,cap,health,altroot']))
+        # 2. Get Vdevs
+        status_future = executor.submit(parse_zpool_status, run_command_lines([ZPOOL, 'status', '-p']))
+        # 3. Get Datasets
+        zfs_list_future = executor.submit(parse_zfs_list, run_command_lines(ZFS_LIST_COMMAND))
+        # 4. Get Snapshots
+        snap_future = executor.submit(parse_zfs_snapshots, run_command_lines(ZFS_SNAPSHOTS_COMMAND))
+
+        pools = pool_list_future.result()
+        vdevs_map = status_future.result()
+        all_datasets = zfs_list_future.result()
+        snaps_map = snap_future.result()
     
-    # 4. Get Snapshots
-    snap_out = run_command(['zfs', 'list', '-H', '-t', 'snapshot', '-o', 'name,used'])
-    snaps_map = parse_zfs_snapshots(snap_out)
-    
-    # Attach snapshots to datasets
-    for ds in all_datasets:
-        if ds.name in snaps_map:
-            ds.snapshots = snaps_map[ds.name]
-            
-    # Build Tree
-    root_datasets = build_dataset_tree(all_datasets)
+    roots_by_name = {ds.name: ds for ds in _assemble_datasets(all_datasets, snaps_map)}
     
     # Attach Vdevs and Datasets to Pools
     for pool in pools:
-        if pool.name in vdevs_map:
-            pool.vdevs = vdevs_map[pool.name]
+        pool.vdevs = vdevs_map.get(pool.name, [])
         
         # Find root dataset for this pool
-        pool.datasets = [ds for ds in root_datasets if ds.name == pool.name]
+        root = roots_by_name.get(pool.name)
+        pool.datasets = [root] if root else []
         
     return pools
 
-def get_system_status() -> List[Pool]:
-    # Deprecated: Use get_static_data for structure and background thread for stats
-    return get_static_data()
+def _assemble_datasets(datasets: List[Dataset], snaps_map: Dict[str, List[Snapshot]]) -> List[Dataset]:
+    # Attach snapshots to datasets
+    for ds in datasets:
+        if ds.name in snaps_map:
+            ds.snapshots = snaps_map[ds.name]
+
+    # Build Tree
+    return build_dataset_tree(datasets)
+
+def get_pool_datasets(pool_name: str) -> List[Dataset]:
+    """
+    Fetches the dataset tree (with snapshots) of a single pool,
+    i.e. the part of get_static_data a dataset change invalidates.
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        zfs_list_future = executor.submit(parse_zfs_list, run_command_lines(ZFS_LIST_COMMAND + ['-r', pool_name]))
+        snap_future = executor.submit(parse_zfs_snapshots, run_command_lines(ZFS_SNAPSHOTS_COMMAND + ['-r', pool_name]))
+        root_datasets = _assemble_datasets(zfs_list_future.result(), snap_future.result())
+
+    return [ds for ds in root_datasets if ds.name == pool_name]
+
+class ZfsCache:
+    """
+    Holds the last structural snapshot of all pools and refreshes only what changed.
+    Pool level changes (zpool.cache, imported pools) reload everything through
+    get_static_data; a change to one pool's ZED zfs-list.cache file, which
+    zfs-list-cacher rewrites on dataset create/destroy/rename, only re-lists
+    that pool's datasets.
+    """
+
+    def __init__(self):
+        self.pools: List[Pool] = []
+        self.generation: Optional[tuple] = None
+
+    def refresh(self, force: bool = False) -> bool:
+        """Brings `pools` up to date. Returns True if anything was reloaded."""
+        generation = get_structure_generation()
+        if not force and generation == self.generation:
+            return False
+
+        if force or self.generation is None or generation[:2] != self.generation[:2]:
+            self.pools = get_static_data()
+        else:
+            old_lists = dict(self.generation[2])
+            new_lists = dict(generation[2])
+            changed = {name for name in old_lists.keys() | new_lists.keys()
+                       if old_lists.get(name) != new_lists.get(name)}
+            for pool in self.pools:
+                if pool.name in changed:
+                    pool.datasets = get_pool_datasets(pool.name)
+
+        self.generation = generation
+        return True
+
+def _mtime(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+def get_structure_generation() -> tuple:
+    """
+    Returns a cheap fingerprint of the pool/dataset layout, no zfs commands involved.
+    - zpool.cache is rewritten on pool config changes (import, export, vdev changes)
+    - the kstat directory lists the imported pools
+    - ZED's zfs-list-cacher rewrites `/etc/zfs/zfs-list.cache/<pool>` whenever a
+      dataset is created, destroyed or changed
+    """
+    try:
+        pools = tuple(sorted(os.listdir(KSTAT_DIR)))
+    except OSError:
+        pools = ()
+
+    try:
+        entries = os.scandir(ZFS_LIST_CACHE_DIR)
+    except OSError:
+        list_cache = ()
+    else:
+        with entries:
+            # A file can vanish between the listing and its stat (pool export)
+            list_cache = tuple(sorted((entry.name, _mtime(entry.path)) for entry in entries))
 
+    return (_mtime(ZPOOL_CACHE_FILE), pools, list_cache)
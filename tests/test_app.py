@@ -0,0 +1,87 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from zfs_dashboard import zfs
+from zfs_dashboard.ui import app as app_module
+from zfs_dashboard.ui.app import ZfsDashboardApp
+from zfs_dashboard.ui.screens import DashboardScreen
+
+def read_pid(pid_file):
+    with open(pid_file) as f:
+        return f.read().strip()
+
+def is_running(pid):
+    # A killed but not yet reaped child shows up as a zombie ("Z")
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().split(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+class TestIostatWorker(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.pid_file = os.path.join(tmp.name, "pid")
+        # A zpool stand-in that ignores SIGTERM
+        self.command = ["sh", "-c", f"trap '' TERM; echo $$ > {self.pid_file}; while :; do sleep 0.1; done"]
+
+    async def wait_for_pid(self):
+        while not os.path.exists(self.pid_file) or not read_pid(self.pid_file):
+            await asyncio.sleep(0.01)
+        return int(read_pid(self.pid_file))
+
+    async def test_stop_after_double_cancel_kills_stubborn_zpool(self):
+        app = ZfsDashboardApp()
+        with mock.patch.object(app_module, "IOSTAT_COMMAND", self.command):
+            task = asyncio.create_task(app.iostat_worker())
+            pid = await self.wait_for_pid()
+
+            # Shutdown: the worker is cancelled, then cancelled again while
+            # it waits for zpool to exit, then the app unmounts
+            task.cancel()
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            await app.stop_iostat()
+
+        self.assertFalse(is_running(pid))
+        self.assertIsNotNone(app._iostat_process.returncode)
+
+    async def test_app_exit_stops_zpool(self):
+        app = ZfsDashboardApp()
+        with mock.patch.object(zfs, "run_command_lines", return_value=iter(())), \
+             mock.patch.object(app_module, "IOSTAT_COMMAND", self.command):
+            async with app.run_test() as pilot:
+                pid = await self.wait_for_pid()
+                # The structure loads in a thread worker; quit once it's shown
+                while not isinstance(app.screen, DashboardScreen):
+                    await pilot.pause(0.01)
+                await pilot.pause()
+
+        self.assertFalse(is_running(pid))
+        self.assertIsNotNone(app._iostat_process.returncode)
+
+    async def test_structure_reload_runs_in_a_thread(self):
+        threads = []
+        def refresh(force=False):
+            threads.append(threading.current_thread())
+            return False
+
+        app = ZfsDashboardApp()
+        with mock.patch.object(app.cache, "refresh", refresh), \
+             mock.patch.object(app_module, "IOSTAT_COMMAND", ["sleep", "30"]):
+            async with app.run_test() as pilot:
+                while not threads:
+                    await pilot.pause(0.01)
+
+        self.assertIsNot(threads[0], threading.main_thread())
+
+if __name__ == '__main__':
+    unittest.main()
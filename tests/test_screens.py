@@ -0,0 +1,57 @@
+import unittest
+
+from textual.app import App
+
+from zfs_dashboard.models import Pool, Vdev
+from zfs_dashboard.ui.screens import DashboardScreen
+
+def make_pool(name):
+    return Pool(name=name, state="ONLINE", size="", alloc="", free="", frag="", cap="", health="ONLINE",
+                vdevs=[Vdev(name="mirror-0", state="ONLINE")])
+
+class TestDashboardScreen(unittest.TestCase):
+
+    def test_iostat_skips_vdevs_of_filtered_pools(self):
+        tank = make_pool("tank")
+        screen = DashboardScreen([tank], ["tank", "backup"])
+
+        screen.update_iostat_data(("tank", 1, 1, 1, 1))
+        screen.update_iostat_data(("mirror-0", 5, 5, 5, 5))
+        # backup is hidden by the pool filter but still in the stream
+        screen.update_iostat_data(("backup", 2, 2, 2, 2))
+        screen.update_iostat_data(("mirror-0", 99, 99, 99, 99))
+
+        self.assertEqual(tank.read_ops, 1)
+        self.assertEqual(tank.vdevs[0].read_ops, 5)
+
+class ScreenApp(App):
+    def __init__(self, pools):
+        super().__init__()
+        self.pools = pools
+
+    def on_mount(self):
+        self.push_screen(DashboardScreen(self.pools))
+
+class TestDashboardScreenMounted(unittest.IsolatedAsyncioTestCase):
+
+    async def test_all_tab_samples_steady_totals(self):
+        app = ScreenApp([make_pool("tank"), make_pool("backup")])
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            screen = app.screen
+            tank = screen._widgets["tank"]["overview"]
+            overall = screen._widgets["all"]["overview"]
+            tank_samples = len(tank.read_history)
+            all_samples = len(overall.read_history)
+
+            # Same numbers every second, as from an idle pool
+            for _ in range(3):
+                screen.update_iostat_data(("tank", 1, 1, 1, 1))
+                screen.flush_iostat()
+
+            self.assertEqual(len(tank.read_history), tank_samples + 3)
+            self.assertEqual(len(overall.read_history), all_samples + 3)
+        self.assertIsNone(app._exception)
+
+if __name__ == '__main__':
+    unittest.main()
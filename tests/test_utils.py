@@ -0,0 +1,16 @@
+import unittest
+from zfs_dashboard.utils import humanize_bytes
+
+class TestHumanizeBytes(unittest.TestCase):
+
+    def test_humanize_bytes(self):
+        self.assertEqual(humanize_bytes(0), "0B")
+        self.assertEqual(humanize_bytes(1), "1.0B")
+        self.assertEqual(humanize_bytes(1023), "1023.0B")
+        self.assertEqual(humanize_bytes(1024), "1.0K")
+        self.assertEqual(humanize_bytes(1536), "1.5K")
+        self.assertEqual(humanize_bytes(5 * 1024 ** 4), "5.0T")
+        self.assertEqual(humanize_bytes(2048 * 1024 ** 8), "2048.0Y")
+
+if __name__ == '__main__':
+    unittest.main()
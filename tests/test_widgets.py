@@ -0,0 +1,61 @@
+import re
+import unittest
+
+from textual.app import App
+from textual.widgets import Tree
+
+from zfs_dashboard.models import Dataset
+from zfs_dashboard.ui.widgets import DatasetTreeWidget
+from zfs_dashboard.zfs import build_dataset_tree
+
+def make_datasets(names):
+    return build_dataset_tree([Dataset(name=n, used="1", avail="1", refer="1", mountpoint=f"/{n}") for n in names])
+
+def shown(node):
+    # Dataset names under `node`, in display (pre-)order
+    names = []
+    for child in node.children:
+        names.append(child.data.name)
+        names.extend(shown(child))
+    return names
+
+class TreeApp(App):
+    def compose(self):
+        yield DatasetTreeWidget("tank")
+
+class TestDatasetTreeWidget(unittest.IsolatedAsyncioTestCase):
+
+    async def test_datasets_and_search(self):
+        app = TreeApp()
+        async with app.run_test() as pilot:
+            widget = app.query_one(DatasetTreeWidget)
+            widget.datasets = make_datasets(["tank", "tank/a", "tank/a/x", "tank/b", "tank/b/y", "tank/c"])
+            await pilot.pause()
+            tree = widget.query_one(Tree)
+            self.assertEqual(shown(tree.root), ["tank", "tank/a", "tank/a/x", "tank/b", "tank/b/y", "tank/c"])
+
+            # Matches keep their ancestors, everything else is removed
+            widget.apply_search("Y")
+            await pilot.pause()
+            self.assertEqual(shown(tree.root), ["tank", "tank/b", "tank/b/y"])
+
+            # Clearing the search puts nodes back in their listed order
+            widget.apply_search("")
+            await pilot.pause()
+            self.assertEqual(shown(tree.root), ["tank", "tank/a", "tank/a/x", "tank/b", "tank/b/y", "tank/c"])
+
+            # Bringing back most of the tree rebuilds it instead
+            widget.apply_search("c")
+            await pilot.pause()
+            self.assertEqual(shown(tree.root), ["tank", "tank/c"])
+            widget.apply_search("")
+            await pilot.pause()
+            self.assertEqual(shown(tree.root), ["tank", "tank/a", "tank/a/x", "tank/b", "tank/b/y", "tank/c"])
+
+            widget.dataset_filter = re.compile("/b")
+            await pilot.pause()
+            self.assertEqual(shown(tree.root), ["tank", "tank/b", "tank/b/y"])
+        self.assertIsNone(app._exception)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,9 @@
+import os
+import tempfile
 import unittest
-from zfs_dashboard.zfs import parse_zpool_list, parse_zpool_status, parse_zfs_list, parse_zfs_snapshots, build_dataset_tree
+from unittest import mock
+from zfs_dashboard import zfs
+from zfs_dashboard.zfs import run_command_lines, parse_iostat_line, parse_zpool_iostat, parse_zpool_list, parse_zpool_status, parse_zfs_list, parse_zfs_snapshots, build_dataset_tree
 
 class TestZFSParsers(unittest.TestCase):
 
@@ -10,6 +14,17 @@ class TestZFSParsers(unittest.TestCase):
         self.assertEqual(pools[0].name, "tank")
         self.assertEqual(pools[0].size, "10T")
         self.assertEqual(pools[0].health, "ONLINE")
+        self.assertEqual(pools[0].size_bytes, 0)
+
+    def test_parse_zpool_list_parsable(self):
+        output = "tank\t10995116277760\t5497558138880\t5497558138880\t10\t50\tONLINE\t-"
+        pools = parse_zpool_list(output)
+        self.assertEqual(pools[0].size, "10.0T")
+        self.assertEqual(pools[0].size_bytes, 10995116277760)
+        self.assertEqual(pools[0].alloc_bytes, 5497558138880)
+        self.assertEqual(pools[0].free_bytes, 5497558138880)
+        self.assertEqual(pools[0].frag, "10%")
+        self.assertEqual(pools[0].cap, "50%")
 
     def test_parse_zpool_status(self):
         output = """
@@ -32,18 +47,55 @@ config:
         self.assertEqual(vdevs[1].name, "sda")
         self.assertEqual(vdevs[1].type, "disk")
 
+    def test_parse_zpool_status_multiple_pools(self):
+        output = """
+  pool: backup
+ state: DEGRADED
+  scan: scrub repaired 0B in 00:00:01 with 0 errors on Sun Oct 11 00:24:02 2026
+config:
+
+\tNAME        STATE     READ WRITE CKSUM
+\tbackup      DEGRADED     0     0     0
+\t  raidz1-0  DEGRADED     0     0     0
+\t    sdc     ONLINE       0     0    12
+\t    sdd     FAULTED  1234     0     0  too many errors
+
+errors: No known data errors
+
+  pool: tank
+ state: ONLINE
+config:
+
+\tNAME        STATE     READ WRITE CKSUM
+\ttank        ONLINE       0     0     0
+\t  sda       ONLINE       0     0     0
+\tlogs
+\t  nvme0n1   ONLINE       0     0     0
+
+errors: No known data errors
+"""
+        vdevs_map = parse_zpool_status(output)
+        backup = vdevs_map["backup"]
+        self.assertEqual([v.name for v in backup], ["raidz1-0", "sdc", "sdd"])
+        self.assertEqual(backup[0].type, "raidz")
+        self.assertEqual(backup[1].cksum, 12)
+        self.assertEqual(backup[2].state, "FAULTED")
+        self.assertEqual(backup[2].read, 1234)
+        self.assertEqual([v.name for v in vdevs_map["tank"]], ["sda", "nvme0n1"])
+
     def test_parse_zfs_list(self):
-        output = """tank\t5T\t5T\t100G\t/tank\toff\tfilesystem
-tank/data\t4T\t1T\t4T\t/tank/data\ton\tfilesystem"""
+        output = """tank\t5T\t5T\t100G\t/tank\toff
+tank/data\t4T\t1T\t4T\t/tank/data\ton"""
         datasets = parse_zfs_list(output)
         self.assertEqual(len(datasets), 2)
         self.assertEqual(datasets[0].name, "tank")
         self.assertEqual(datasets[1].name, "tank/data")
         self.assertEqual(datasets[1].compression, "on")
+        self.assertEqual(datasets[1].label, "tank/data [dim]4T 1T on /tank/data[/]")
 
     def test_build_dataset_tree(self):
-        output = """tank\t5T\t5T\t100G\t/tank\toff\tfilesystem
-tank/data\t4T\t1T\t4T\t/tank/data\ton\tfilesystem"""
+        output = """tank\t5T\t5T\t100G\t/tank\toff
+tank/data\t4T\t1T\t4T\t/tank/data\ton"""
         datasets = parse_zfs_list(output)
         roots = build_dataset_tree(datasets)
         self.assertEqual(len(roots), 1)
@@ -51,6 +103,15 @@ tank/data\t4T\t1T\t4T\t/tank/data\ton\tfilesystem"""
         self.assertEqual(len(roots[0].children), 1)
         self.assertEqual(roots[0].children[0].name, "tank/data")
 
+    def test_build_dataset_tree_strcmp_order(self):
+        names = ["tank", "tank/a", "tank/a-b", "tank/a/c", "tank/x/orphan", "other"]
+        datasets = parse_zfs_list("\n".join(f"{n}\t1\t1\t1\t/{n}\toff" for n in names))
+        roots = build_dataset_tree(datasets)
+        self.assertEqual([ds.name for ds in roots], ["tank", "tank/x/orphan", "other"])
+        tank = roots[0]
+        self.assertEqual([ds.name for ds in tank.children], ["tank/a", "tank/a-b"])
+        self.assertEqual([ds.name for ds in tank.children[0].children], ["tank/a/c"])
+
     def test_parse_zfs_snapshots(self):
         output = "tank/data@snap1\t1G\ntank/data@snap2\t2G"
         snaps_map = parse_zfs_snapshots(output)
@@ -59,5 +120,136 @@ tank/data\t4T\t1T\t4T\t/tank/data\ton\tfilesystem"""
         self.assertEqual(snaps_map["tank/data"][0].name, "snap1")
         self.assertEqual(snaps_map["tank/data"][0].used, "1G")
 
+    def test_parse_zfs_list_lines(self):
+        lines = iter([
+            "tank\t5T\t5T\t100G\t/tank\toff\n",
+            "tank/data\t4T\t1T\t4T\t/tank/data\ton\n",
+        ])
+        datasets = parse_zfs_list(lines)
+        self.assertEqual([ds.name for ds in datasets], ["tank", "tank/data"])
+        self.assertEqual(datasets[1].compression, "on")
+
+    def test_run_command_lines(self):
+        self.assertEqual(list(run_command_lines(["echo", "tank"])), ["tank\n"])
+        self.assertEqual(list(run_command_lines(["/nonexistent/zpool", "list"])), [])
+
+    def test_parse_iostat_line(self):
+        self.assertEqual(
+            parse_iostat_line("tank\t1000\t2000\t3\t4\t5120\t6144\n"),
+            ("tank", 3, 4, 5120, 6144),
+        )
+        self.assertEqual(
+            parse_iostat_line("\tmirror-0\t1000\t2000\t1\t2\t512\t1024\n"),
+            ("mirror-0", 1, 2, 512, 1024),
+        )
+        self.assertIsNone(parse_iostat_line("\n"))
+        self.assertIsNone(parse_iostat_line("tank\t-\t-\t-\t-\t-\t-\n"))
+
+    def test_parse_zpool_iostat(self):
+        output = """              capacity     operations     bandwidth
+pool        alloc   free   read  write   read  write
+----------  -----  -----  -----  -----  -----  -----
+tank         1000   2000      3      4   5120   6144
+  mirror-0   1000   2000      1      2    512   1024
+    sda         -      -      1      1    256    512
+----------  -----  -----  -----  -----  -----  -----
+"""
+        stats = parse_zpool_iostat(output)
+        self.assertEqual(stats["tank"]["__pool__"],
+                         {"read_ops": 3, "write_ops": 4, "read_bytes": 5120, "write_bytes": 6144})
+        self.assertEqual(stats["tank"]["mirror-0"]["read_bytes"], 512)
+        self.assertEqual(stats["tank"]["sda"]["write_bytes"], 512)
+
+    def test_get_structure_generation(self):
+        with tempfile.TemporaryDirectory() as root:
+            cache_dir = os.path.join(root, "zfs-list.cache")
+            kstat_dir = os.path.join(root, "kstat")
+            os.mkdir(cache_dir)
+            os.mkdir(kstat_dir)
+            with mock.patch.multiple(zfs, ZFS_LIST_CACHE_DIR=cache_dir, KSTAT_DIR=kstat_dir,
+                                     ZPOOL_CACHE_FILE=os.path.join(root, "zpool.cache")):
+                empty = zfs.get_structure_generation()
+                path = os.path.join(cache_dir, "tank")
+                with open(path, "w") as f:
+                    f.write("tank\t/tank\n")
+                first = zfs.get_structure_generation()
+                self.assertNotEqual(empty, first)
+                self.assertEqual(first, zfs.get_structure_generation())
+                os.utime(path, ns=(0, 0))
+                second = zfs.get_structure_generation()
+                self.assertNotEqual(first, second)
+                os.mkdir(os.path.join(kstat_dir, "backup"))
+                self.assertNotEqual(second, zfs.get_structure_generation())
+
+        with mock.patch.multiple(zfs, ZFS_LIST_CACHE_DIR="/nonexistent/zfs-list.cache",
+                                 KSTAT_DIR="/nonexistent/kstat", ZPOOL_CACHE_FILE="/nonexistent/zpool.cache"):
+            self.assertEqual(zfs.get_structure_generation(), (0, (), ()))
+
+    def test_get_structure_generation_file_removed_while_listing(self):
+        real_scandir = os.scandir
+
+        class RemovingScandir:
+            # Deletes each file right after the directory listing returns it
+            def __init__(self, path):
+                self.entries = real_scandir(path)
+            def __enter__(self):
+                return self
+            def __exit__(self, *exc):
+                self.entries.close()
+            def __iter__(self):
+                for entry in self.entries:
+                    os.remove(entry.path)
+                    yield entry
+
+        with tempfile.TemporaryDirectory() as root:
+            cache_dir = os.path.join(root, "zfs-list.cache")
+            os.mkdir(cache_dir)
+            with open(os.path.join(cache_dir, "tank"), "w") as f:
+                f.write("tank\t/tank\n")
+            with mock.patch.multiple(zfs, ZFS_LIST_CACHE_DIR=cache_dir, KSTAT_DIR=os.path.join(root, "kstat"),
+                                     ZPOOL_CACHE_FILE=os.path.join(root, "zpool.cache")), \
+                 mock.patch.object(zfs.os, "scandir", RemovingScandir):
+                self.assertEqual(zfs.get_structure_generation(), (0, (), (("tank", 0),)))
+
+    def test_zfs_cache_reloads_per_generation(self):
+        with mock.patch.object(zfs, "run_command_lines", return_value=iter(())) as run, \
+             mock.patch.object(zfs, "get_structure_generation", return_value=(1, (), ())) as generation:
+            cache = zfs.ZfsCache()
+            self.assertTrue(cache.refresh())
+            self.assertFalse(cache.refresh())
+            self.assertEqual(run.call_count, 4)
+
+            generation.return_value = (2, (), ())
+            self.assertTrue(cache.refresh())
+            self.assertEqual(run.call_count, 8)
+
+            self.assertTrue(cache.refresh(force=True))
+            self.assertEqual(run.call_count, 12)
+
+    def test_zfs_cache_refreshes_changed_pool_only(self):
+        tank = zfs.Pool(name="tank", state="ONLINE", size="", alloc="", free="", frag="", cap="", health="ONLINE")
+        backup = zfs.Pool(name="backup", state="ONLINE", size="", alloc="", free="", frag="", cap="", health="ONLINE")
+        generation = (1, ("backup", "tank"), (("backup", 10), ("tank", 10)))
+        with mock.patch.object(zfs, "get_structure_generation", return_value=generation) as gen, \
+             mock.patch.object(zfs, "get_static_data", return_value=[tank, backup]) as static, \
+             mock.patch.object(zfs, "get_pool_datasets", return_value=["new"]) as pool_datasets:
+            cache = zfs.ZfsCache()
+            self.assertTrue(cache.refresh())
+            self.assertFalse(cache.refresh())
+            self.assertEqual(static.call_count, 1)
+
+            # A dataset changed in tank: only tank is re-listed
+            gen.return_value = (1, ("backup", "tank"), (("backup", 10), ("tank", 11)))
+            self.assertTrue(cache.refresh())
+            pool_datasets.assert_called_once_with("tank")
+            self.assertEqual(tank.datasets, ["new"])
+            self.assertEqual(backup.datasets, [])
+            self.assertEqual(static.call_count, 1)
+
+            # A pool level change reloads everything
+            gen.return_value = (2, ("backup", "tank"), (("backup", 10), ("tank", 11)))
+            self.assertTrue(cache.refresh())
+            self.assertEqual(static.call_count, 2)
+
 if __name__ == '__main__':
     unittest.main()